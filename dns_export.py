@@ -1,73 +1,186 @@
+import asyncio
+import dns.asyncresolver
+import dns.rdatatype
 import dns.resolver
 import json
+import logging
 import argparse
 import sys
 import tldextract
+from collections import Counter
+
+try:
+    import orjson
+except ImportError:  # orjson is optional, fall back to the standard library json module
+    orjson = None
+
+logger = logging.getLogger("dns_export")
+
+# Record types exported with --all
+ALL_RECORD_TYPES = (
+    "A",
+    "AAAA",
+    "AFSDB",
+    "APL",
+    "CAA",
+    "CDNSKEY",
+    "CDS",
+    "CERT",
+    "CNAME",
+    "DHCID",
+    "DLV",
+    "DNAME",
+    "DNSKEY",
+    "DS",
+    "EUI48",
+    "EUI64",
+    "HINFO",
+    "HIP",
+    "IPSECKEY",
+    "KEY",
+    "KX",
+    "LOC",
+    "MX",
+    "NAPTR",
+    "NS",
+    "NSEC",
+    "NSEC3",
+    "NSEC3PARAM",
+    "PTR",
+    "RP",
+    "SIG",
+    "SMIMEA",
+    "SOA",
+    "SPF",
+    "SRV",
+    "SSHFP",
+    "SVCB",
+    "TLSA",
+    "TXT",
+    "URI",
+    "ZONEMD",
+)
+
+# Record types exported by default
+DEFAULT_RECORD_TYPES = ("A", "AAAA", "CNAME", "MX", "TXT", "SPF")
+
+# Maximum number of DNS queries in flight at any one time
+MAX_CONCURRENT_QUERIES = 50
+
+# Maximum number of domains resolved ahead of the one currently being written
+MAX_PENDING_DOMAINS = 20
+
+class ResolverCache(dns.resolver.LRUCache):
+    """
+    LRU answer cache that does not remember NXDOMAIN answers reached through a CNAME chain.
+
+    dnspython caches an NXDOMAIN under the queried name (with rdtype ANY) even when it is the
+    CNAME target that does not exist. Every later query for that name, including the CNAME
+    query itself, would then fail from the cache and drop the CNAME record from the export.
+    """
+
+    def put(self, key, value):
+        qname, rdtype, _ = key
+        if rdtype == dns.rdatatype.ANY and value.canonical_name != qname:
+            return
+        super().put(key, value)
+
+
+# Resolver shared by all queries, configured once instead of from /etc/resolv.conf.
+# Its cache honours record TTLs and also keeps NXDOMAIN and no-answer responses, for the
+# negative TTL the zone's SOA record specifies (RFC 2308).
+RESOLVER = dns.asyncresolver.Resolver(configure=False)
+RESOLVER.nameservers = ["8.8.8.8", "8.8.4.4"]  # Using Google's DNS servers
+RESOLVER.timeout = 2
+RESOLVER.lifetime = 5
+RESOLVER.cache = ResolverCache(10_000)
+
+
+def _parse_raw(rdata, ttl):
+    return str(rdata)
+
+
+def _parse_default(rdata, ttl):
+    return (str(rdata), ttl)
+
+
+def _parse_mx(rdata, ttl):
+    return (str(rdata.exchange), rdata.preference, ttl)
+
+
+def _parse_srv(rdata, ttl):
+    return (str(rdata.target), rdata.priority, rdata.weight, rdata.port, ttl)
+
+
+def _parse_naptr(rdata, ttl):
+    return (str(rdata.replacement), rdata.order, rdata.preference, ttl)
+
 
+# Record types whose rdata is split into separate fields; all others use _parse_default
+_PARSERS = {
+    "MX": _parse_mx,
+    "SRV": _parse_srv,
+    "NAPTR": _parse_naptr,
+}
 
-def get_records(domain, record_types, raw_output=False, keep_a_aaaa=False):
+
+async def get_records(domain, record_types, semaphore, raw_output=False, keep_a_aaaa=False):
     """
     Retrieve DNS records for a given domain.
 
+    All record types are queried concurrently; the shared semaphore bounds the
+    number of queries in flight across every domain being exported.
+
     Args:
         domain (str): The domain name to query.
-        record_types (list): List of record types to query.
+        record_types (tuple): Record types to query.
+        semaphore (asyncio.Semaphore): Limits the number of concurrent DNS queries.
         raw_output (bool): If True, return raw DNS data. If False, format the data.
         keep_a_aaaa (bool): If True, keep A and AAAA records even when CNAME exists.
 
     Returns:
         dict: A dictionary containing DNS records, organized by record type.
-
-    Raises:
-        dns.resolver.NXDOMAIN: If the domain does not exist.
     """
-    resolver = dns.resolver.Resolver()
-    resolver.nameservers = ["8.8.8.8", "8.8.4.4"]  # Using Google's DNS servers
-
-    records = {}
-
-    for record_type in record_types:
+    async def query(record_type):
         try:
-            answers = resolver.resolve(domain, record_type)
-
-            if raw_output:
-                records[record_type] = [str(rdata) for rdata in answers]
-            elif record_type in ["MX", "SRV", "NAPTR"]:
-                records[record_type] = [
-                    (
-                        (str(rdata.exchange), rdata.preference, answers.ttl)
-                        if record_type == "MX"
-                        else (
-                            (
-                                str(rdata.target),
-                                rdata.priority,
-                                rdata.weight,
-                                rdata.port,
-                                answers.ttl,
-                            )
-                            if record_type == "SRV"
-                            else (
-                                str(rdata.replacement),
-                                rdata.order,
-                                rdata.preference,
-                                answers.ttl,
-                            )
-                        )
-                    )
-                    for rdata in answers
-                ]
-            else:
-                records[record_type] = [(str(rdata), answers.ttl) for rdata in answers]
+            async with semaphore:
+                return await RESOLVER.resolve(domain, record_type)
         except dns.resolver.NXDOMAIN:
             # Domain does not exist, skip it
-            continue
+            return None
         except dns.resolver.NoAnswer:
             # No records of this type, just continue to the next type
-            continue
+            return None
         except Exception as e:
             print(f"Error querying {record_type} records for {domain}: {str(e)}", file=sys.stderr)
+            return None
+
+    # Probe the domain first, so a domain that does not exist costs one query
+    # instead of one per record type
+    try:
+        async with semaphore:
+            await RESOLVER.resolve(domain, "SOA")
+    except dns.resolver.NXDOMAIN as e:
+        # A CNAME pointing at a name that does not exist also ends in NXDOMAIN; only skip
+        # the domain when the queried name itself does not exist
+        if e.canonical_name == e.qnames()[0]:
+            return {}
+    except Exception:
+        # Other failures (e.g. no SOA record at a subdomain) are left to the per-type queries
+        pass
+
+    # gather() keeps the results in the same order as record_types
+    results = await asyncio.gather(*(query(record_type) for record_type in record_types))
+
+    records = {}
+
+    for record_type, answers in zip(record_types, results):
+        if answers is None:
             continue
 
+        parse = _parse_raw if raw_output else _PARSERS.get(record_type, _parse_default)
+        records[record_type] = [parse(rdata, answers.ttl) for rdata in answers]
+
     # Post-processing: Remove A and AAAA records if CNAME exists, unless keep_a_aaaa is True
     if "CNAME" in records and not keep_a_aaaa:
         records.pop("A", None)
@@ -76,6 +189,57 @@ def get_records(domain, record_types, raw_output=False, keep_a_aaaa=False):
     return records
 
 
+def _format_default(record):
+    # Handle other record types (A, AAAA, CNAME, NS)
+    content, ttl = record
+    return {"content": content, "ttl": str(ttl)}
+
+
+def _format_txt(record):
+    content, ttl = record
+    # Remove the quotes dnspython puts around the TXT data
+    if len(content) >= 2 and content[0] == '"' and content[-1] == '"':
+        content = content[1:-1]
+    return {"content": content, "ttl": str(ttl)}
+
+
+def _format_mx(record):
+    content, prio, ttl = record
+    return {
+        "content": content,
+        "ttl": str(ttl),
+        "prio": str(prio),
+    }
+
+
+def _format_srv(record):
+    target, priority, weight, port, ttl = record
+    return {
+        "content": f"{weight} {port} {target}",
+        "ttl": str(ttl),
+        "prio": str(priority),
+    }
+
+
+def _format_naptr(record):
+    replacement, order, preference, ttl = record
+    return {
+        "content": replacement,
+        "ttl": str(ttl),
+        "order": str(order),
+        "preference": str(preference),
+    }
+
+
+# Formatters for record types that need more than content and ttl; all others use _format_default
+_FORMATTERS = {
+    "MX": _format_mx,
+    "SRV": _format_srv,
+    "NAPTR": _format_naptr,
+    "TXT": _format_txt,
+}
+
+
 def format_records(domain, records, verbosity=0):
     """
     Format DNS records into a structured dictionary.
@@ -91,45 +255,27 @@ def format_records(domain, records, verbosity=0):
     formatted = {domain: {}}
 
     for record_type, record_list in records.items():
-        formatted[domain][record_type] = []
-
-        for record in record_list:
-            if record_type in ["MX", "SRV", "NAPTR"]:
-                if record_type == "MX":
-                    content, prio, ttl = record
-                    record_data = {
-                        "content": content,
-                        "ttl": str(ttl),
-                        "prio": str(prio),
-                    }
-                elif record_type == "SRV":
-                    target, priority, weight, port, ttl = record
-                    record_data = {
-                        "content": f"{weight} {port} {target}",
-                        "ttl": str(ttl),
-                        "prio": str(priority),
-                    }
-                else:  # NAPTR
-                    replacement, order, preference, ttl = record
-                    record_data = {
-                        "content": replacement,
-                        "ttl": str(ttl),
-                        "order": str(order),
-                        "preference": str(preference),
-                    }
-            elif record_type == "TXT":
-                content, ttl = record
-                record_data = {"content": content.strip('"'), "ttl": str(ttl)}
-            else:
-                # Handle other record types (A, AAAA, CNAME, NS)
-                content, ttl = record
-                record_data = {"content": content, "ttl": str(ttl)}
-
-            formatted[domain][record_type].append(record_data)
+        format_record = _FORMATTERS.get(record_type, _format_default)
+        formatted[domain][record_type] = [format_record(record) for record in record_list]
 
     return formatted
 
 
+def dumps_json(data):
+    """
+    Serialize data as indented JSON, using orjson when it is available.
+
+    Args:
+        data: The JSON-serializable data to serialize.
+
+    Returns:
+        bytes: The UTF-8 encoded JSON document.
+    """
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    return json.dumps(data, indent=2).encode()
+
+
 def print_usage():
     """
     Print usage information for the DNS export tool.
@@ -216,77 +362,74 @@ def main():
     verbosity = args.verbose
     raw_output = args.raw
 
-    if args.all:
-        record_types = [
-            "A",
-            "AAAA",
-            "AFSDB",
-            "APL",
-            "CAA",
-            "CDNSKEY",
-            "CDS",
-            "CERT",
-            "CNAME",
-            "DHCID",
-            "DLV",
-            "DNAME",
-            "DNSKEY",
-            "DS",
-            "EUI48",
-            "EUI64",
-            "HINFO",
-            "HIP",
-            "IPSECKEY",
-            "KEY",
-            "KX",
-            "LOC",
-            "MX",
-            "NAPTR",
-            "NS",
-            "NSEC",
-            "NSEC3",
-            "NSEC3PARAM",
-            "PTR",
-            "RP",
-            "SIG",
-            "SMIMEA",
-            "SOA",
-            "SPF",
-            "SRV",
-            "SSHFP",
-            "SVCB",
-            "TLSA",
-            "TXT",
-            "URI",
-            "ZONEMD",
-        ]
-    else:
-        record_types = ["A", "AAAA", "CNAME", "MX", "TXT", "SPF"]
+    # Verbose output goes to stderr, so it never mixes with the JSON written to stdout
+    logging.basicConfig(format="%(message)s")
+    logger.setLevel(logging.DEBUG if verbosity >= 1 else logging.WARNING)
+
+    record_types = ALL_RECORD_TYPES if args.all else DEFAULT_RECORD_TYPES
 
     if args.exclude:
-        record_types = [rt for rt in record_types if rt not in args.exclude]
+        excluded = set(args.exclude)
+        record_types = tuple(rt for rt in record_types if rt not in excluded)
+
+    async def export_records(out):
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_QUERIES)
+
+        # One task per distinct domain: the resolver cache only helps once an answer has
+        # arrived, so a domain listed twice would otherwise be queried twice concurrently.
+        # Domains are started by position, at most MAX_PENDING_DOMAINS in flight ahead of
+        # the writer. Results of a domain that occurs again later are held until its last
+        # occurrence has been written; they do not count against the in-flight window.
+        pending = {}
+        held = {}
+        remaining = Counter(domains)
+        next_index = 0
+
+        def schedule():
+            nonlocal next_index
+            while next_index < len(domains) and len(pending) < MAX_PENDING_DOMAINS:
+                domain = domains[next_index]
+                next_index += 1
+                if domain not in pending and domain not in held:
+                    pending[domain] = asyncio.create_task(
+                        get_records(domain, record_types, semaphore, raw_output, args.keep_a_aaaa)
+                    )
 
-    all_records = []
+        # Stream the JSON array one domain at a time, in input order, as soon as each
+        # domain's records are available
+        out.write(b"[")
+        for index, domain in enumerate(domains):
+            # Everything in flight lies between the writer and next_index, so the domain
+            # at the writer's position is always either held or pending after this call
+            schedule()
+            if domain in held:
+                records = held[domain]
+            else:
+                records = await pending.pop(domain)
+                held[domain] = records
 
-    for domain in domains:
-        if verbosity >= 1:
-            print(f"Fetching DNS records for {domain}", file=sys.stderr)
+            remaining[domain] -= 1
+            if not remaining[domain]:
+                del held[domain]
 
-        records = get_records(domain, record_types, raw_output, args.keep_a_aaaa)
+            logger.debug("Raw records for %s: %s", domain, records)
 
-        if verbosity >= 1:
-            print(f"Raw records for {domain}: {records}", file=sys.stderr)
+            if raw_output:
+                formatted_records = {domain: records}
+            else:
+                formatted_records = format_records(domain, records, verbosity)
 
-        if raw_output:
-            formatted_records = {domain: records}
-        else:
-            formatted_records = format_records(domain, records, verbosity)
+            out.write(b",\n  " if index else b"\n  ")
+            out.write(dumps_json(formatted_records).replace(b"\n", b"\n  "))
+            out.flush()
+        out.write(b"\n]")
 
-        all_records.append(formatted_records)
+    for domain in domains:
+        logger.debug("Fetching DNS records for %s", domain)
 
     if output_file:
-        with open(output_file, "w") as f:
-            json.dump(all_records, f, indent=2)
+        with open(output_file, "wb") as f:
+            asyncio.run(export_records(f))
         if verbosity >= 1:
             print(f"DNS records exported to {output_file}", file=sys.stderr)
         else:
@@ -295,7 +438,7 @@ def main():
                 file=sys.stderr,
             )
     else:
-        json.dump(all_records, sys.stdout, indent=2)
+        asyncio.run(export_records(sys.stdout.buffer))
 
 
 if __name__ == "__main__":
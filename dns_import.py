@@ -1,10 +1,23 @@
-import requests
+import httpx
 import json
+import logging
 import os
 import argparse
+import functools
 import sys
+import time
 import traceback
-import jsonschema
+import fastjsonschema
+import tldextract
+from concurrent.futures import ThreadPoolExecutor
+from types import MappingProxyType
+
+try:
+    import orjson
+except ImportError:  # orjson is optional, fall back to the standard library json module
+    orjson = None
+
+logger = logging.getLogger("porkbun")
 
 # Porkbun API credentials
 API_KEY = os.environ.get("PORKBUN_API_KEY")
@@ -15,55 +28,159 @@ if not API_KEY or not SECRET_KEY:
     print("Error: Porkbun API credentials not found. Please set PORKBUN_API_KEY and PORKBUN_SECRET_KEY environment variables.")
     sys.exit(1)
 
+# Authentication fields sent with every API request, and their obfuscated form for verbose output
+_AUTH = MappingProxyType({"secretapikey": SECRET_KEY, "apikey": API_KEY})
+_OBFUSCATED_AUTH = MappingProxyType({"secretapikey": SECRET_KEY[:10] + "...", "apikey": API_KEY[:10] + "..."})
+
 # Base URL for Porkbun API
 BASE_URL = "https://porkbun.com/api/json/v3"
 
-def validate_json_schema(data):
+# Path to the JSON schema for import files, next to this script
+SCHEMA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'schema.json')
+
+# Root domains are extracted with the public suffix list snapshot bundled with tldextract,
+# so no network fetch is made and nothing is cached on disk
+_TLD_EXTRACT = tldextract.TLDExtract(cache_dir=None, suffix_list_urls=())
+
+# Maximum number of records processed concurrently against the Porkbun API
+MAX_WORKERS = 8
+
+# Shared HTTP/2 client: requests from all worker threads are multiplexed over a single
+# connection to the Porkbun API (falling back to HTTP/1.1 if the server does not support it).
+# Failed connection attempts are retried by the transport; the request has not been sent
+# at that point, so this is safe for every endpoint.
+CLIENT = httpx.Client(
+    transport=httpx.HTTPTransport(http2=True, retries=3),
+    timeout=10.0
+)
+
+# Rate limited requests are retried with exponential backoff. Transient server errors are
+# only retried for read-only requests: a 5xx from a proxy may arrive after Porkbun already
+# applied a create or edit, and repeating it would create a duplicate record.
+RATE_LIMIT_STATUS_CODE = 429
+SERVER_ERROR_STATUS_CODES = frozenset([500, 502, 503, 504])
+MAX_RETRIES = 3
+RETRY_BACKOFF = 0.3
+
+def _post(url, payload, idempotent=False):
     """
-    Validate the input JSON data against the schema defined in schema.json.
+    Send a request to the Porkbun API, retrying on rate limiting and, for idempotent
+    requests, on transient server errors.
 
     Args:
-        data (dict): The JSON data to validate.
+        url (str): The API endpoint.
+        payload (dict): The JSON payload to send.
+        idempotent (bool): If True, the request has no side effects and is also retried on 5xx responses.
 
     Returns:
-        bool: True if the data is valid, False otherwise.
+        httpx.Response: The API response; the last one received if all retries fail.
+    """
+    for attempt in range(MAX_RETRIES + 1):
+        response = CLIENT.post(url, json=payload)
+        retry = response.status_code == RATE_LIMIT_STATUS_CODE or (
+            idempotent and response.status_code in SERVER_ERROR_STATUS_CODES
+        )
+        if not retry or attempt == MAX_RETRIES:
+            return response
+        time.sleep(RETRY_BACKOFF * 2 ** attempt)
+
+def _format_json(data):
+    """
+    Serialize data as indented JSON for verbose output, using orjson when it is available.
+
+    Args:
+        data: The JSON-serializable data.
+
+    Returns:
+        str: The indented JSON document.
+    """
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2).decode()
+    return json.dumps(data, indent=2)
+
+def _parse_json(response):
+    """
+    Decode the JSON body of an API response, using orjson when it is available.
+
+    Args:
+        response (httpx.Response): The API response.
+
+    Returns:
+        The decoded JSON data.
+
+    Raises:
+        json.JSONDecodeError: If the response body cannot be decoded.
+    """
+    if orjson is not None:
+        return orjson.loads(response.content)
+    return response.json()
+
+@functools.lru_cache(maxsize=2048)
+def _root_domain(domain):
+    """
+    Extract the registered (root) domain from a domain name, e.g. 'example.co.uk' for 'www.example.co.uk'.
+
+    Args:
+        domain (str): The domain name.
+
+    Returns:
+        str: The root domain, or the domain itself if it has no known public suffix.
+    """
+    return _TLD_EXTRACT(domain).registered_domain or domain
+
+@functools.lru_cache(maxsize=1)
+def _load_validator():
+    """
+    Load schema.json and compile it into a validation function.
+
+    fastjsonschema generates Python code specialized to the schema, so validation does not
+    have to interpret the schema for every document. The result is cached, so the schema is
+    only read and compiled once per process.
+
+    Returns:
+        callable: A function that validates data against the schema in schema.json.
 
     Raises:
         FileNotFoundError: If schema.json is not found.
         json.JSONDecodeError: If schema.json cannot be decoded.
-        jsonschema.exceptions.ValidationError: If the data fails validation.
+        fastjsonschema.JsonSchemaDefinitionException: If schema.json is not a valid schema.
     """
-    # Get the directory of the current script
-    script_dir = os.path.dirname(os.path.abspath(__file__))
+    with open(SCHEMA_PATH, 'r') as schema_file:
+        return fastjsonschema.compile(json.load(schema_file))
 
-    # Construct the path to schema.json
-    schema_path = os.path.join(script_dir, 'schema.json')
+def validate_json_schema(data):
+    """
+    Validate the input JSON data against the schema defined in schema.json.
 
-    try:
-        # Read the schema from the file
-        with open(schema_path, 'r') as schema_file:
-            schema = json.load(schema_file)
+    Args:
+        data (dict): The JSON data to validate.
 
+    Returns:
+        bool: True if the data is valid, False otherwise.
+    """
+    try:
         # Validate the data against the schema
-        jsonschema.validate(instance=data, schema=schema)
+        _load_validator()(data)
         return True
     except FileNotFoundError:
-        print(f"Error: schema.json not found at {schema_path}")
+        print(f"Error: schema.json not found at {SCHEMA_PATH}")
         return False
     except json.JSONDecodeError as e:
         print(f"Error decoding schema.json: {e}")
         return False
-    except jsonschema.exceptions.ValidationError as e:
+    except fastjsonschema.JsonSchemaDefinitionException as e:
+        print(f"Error compiling schema.json: {e}")
+        return False
+    except fastjsonschema.JsonSchemaValueException as e:
         print(f"JSON Schema validation error: {e}")
         return False
 
-def get_existing_records(domain, verbose=False):
+def get_existing_records(domain):
     """
     Retrieve existing DNS records for a given domain using the Porkbun API.
 
     Args:
         domain (str): The domain to retrieve records for.
-        verbose (bool): If True, print detailed information about the API request and response.
 
     Returns:
         list: A list of existing DNS records for the domain, or None if an error occurs.
@@ -72,65 +189,51 @@ def get_existing_records(domain, verbose=False):
         json.JSONDecodeError: If the API response cannot be decoded.
         KeyError: If the expected keys are not found in the API response.
     """
-    # Extract the root domain
-    root_domain = '.'.join(domain.split('.')[-2:])
+    root_domain = _root_domain(domain)
     url = f"{BASE_URL}/dns/retrieve/{root_domain}"
-    payload = {
-        "secretapikey": SECRET_KEY,
-        "apikey": API_KEY
-    }
-    if verbose:
-        print(f"Sending request to: {url}")
-        obfuscated_payload = {
-            "secretapikey": SECRET_KEY[:10] + "...",
-            "apikey": API_KEY[:10] + "..."
-        }
-        print(f"Payload: {json.dumps(obfuscated_payload, indent=2)}")
+    payload = dict(_AUTH)
+    logger.debug("Sending request to: %s", url)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Payload: %s", _format_json({**payload, **_OBFUSCATED_AUTH}))
 
-    response = requests.post(url, json=payload)
+    response = _post(url, payload, idempotent=True)
 
-    if verbose:
-        print(f"Response status code: {response.status_code}")
-        print(f"Response content: {json.dumps(response.json(), indent=2)}")
+    logger.debug("Response status code: %s", response.status_code)
 
     try:
-        result = response.json()
+        result = _parse_json(response)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Response content: %s", _format_json(result))
         if result['status'] == 'SUCCESS' and 'records' in result:
             return result['records']
         else:
-            if verbose:
-                print(f"API returned an error or no records: {result}")
+            logger.debug("API returned an error or no records: %s", result)
             return None
     except json.JSONDecodeError as e:
         print(f"JSON Decode Error: {str(e)}")
-        if verbose:
-            print(f"Response content: {response.text}")
+        logger.debug("Response content: %s", response.text)
         return None
     except KeyError as e:
         print(f"KeyError: {str(e)}")
-        if verbose:
-            print(f"Full Response: {response.text}")
+        logger.debug("Full Response: %s", response.text)
         return None
 
-def create_record(domain, record, verbose=False):
+def create_record(domain, record):
     """
     Create a new DNS record for a given domain using the Porkbun API.
 
     Args:
         domain (str): The domain to create the record for.
         record (dict): The record data to create.
-        verbose (bool): If True, print detailed information about the API request and response.
 
     Returns:
         dict: The API response containing the result of the create operation.
     """
-    # Extract the root domain
-    root_domain = '.'.join(domain.split('.')[-2:])
+    root_domain = _root_domain(domain)
     url = f"{BASE_URL}/dns/create/{root_domain}"
 
     payload = {
-        "secretapikey": SECRET_KEY,
-        "apikey": API_KEY,
+        **_AUTH,
         "type": record['type'],
         "content": record['content'],
         "ttl": record['ttl']
@@ -146,30 +249,26 @@ def create_record(domain, record, verbose=False):
     if record['type'] in ['MX', 'SRV', 'NAPTR']:
         payload['prio'] = record['prio']
 
-    if verbose:
-        print(f"Sending request to: {url}")
-        obfuscated_payload = {**payload, "secretapikey": SECRET_KEY[:10] + "...", "apikey": API_KEY[:10] + "..."}
-        print(f"Payload: {json.dumps(obfuscated_payload, indent=2)}")
+    logger.debug("Sending request to: %s", url)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Payload: %s", _format_json({**payload, **_OBFUSCATED_AUTH}))
 
-    response = requests.post(url, json=payload)
-    result = response.json()
+    response = _post(url, payload)
+    result = _parse_json(response)
 
-    if verbose:
-        print(f"Response status code: {response.status_code}")
-        print(f"Response content: {json.dumps(result, indent=2)}")
+    logger.debug("Response status code: %s", response.status_code)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Response content: %s", _format_json(result))
 
     if result['status'] == 'ERROR':
-        print(f"Error creating record: {record['name']} ({record['type']})")
-        print(f"Error details: {result.get('message', 'No detailed message provided')}")
-        if verbose:
-            print(f"Full error response: {json.dumps(result, indent=2)}")
-            if 'errors' in result:
-                for error in result['errors']:
-                    print(f"  - {error}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Full error response: %s", _format_json(result))
+            for error in result.get('errors', []):
+                logger.debug("  - %s", error)
 
     return result
 
-def update_record(domain, record_id, record, verbose=False):
+def update_record(domain, record_id, record):
     """
     Update an existing DNS record for a given domain using the Porkbun API.
 
@@ -177,18 +276,15 @@ def update_record(domain, record_id, record, verbose=False):
         domain (str): The domain of the record to update.
         record_id (str): The ID of the record to update.
         record (dict): The updated record data.
-        verbose (bool): If True, print detailed information about the API request and response.
 
     Returns:
         dict: The API response containing the result of the update operation.
     """
-    # Extract the root domain
-    root_domain = '.'.join(domain.split('.')[-2:])
+    root_domain = _root_domain(domain)
     url = f"{BASE_URL}/dns/edit/{root_domain}/{record_id}"
 
     payload = {
-        "secretapikey": SECRET_KEY,
-        "apikey": API_KEY,
+        **_AUTH,
         "type": record['type'],
         "content": record['content'],
         "ttl": record['ttl']
@@ -203,90 +299,53 @@ def update_record(domain, record_id, record, verbose=False):
     if 'prio' in record:
         payload['prio'] = record['prio']
 
-    if verbose:
-        print(f"Sending request to: {url}")
-        obfuscated_payload = {**payload, "secretapikey": SECRET_KEY[:10] + "...", "apikey": API_KEY[:10] + "..."}
-        print(f"Payload: {json.dumps(obfuscated_payload, indent=2)}")
+    logger.debug("Sending request to: %s", url)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Payload: %s", _format_json({**payload, **_OBFUSCATED_AUTH}))
 
-    response = requests.post(url, json=payload)
-    result = response.json()
+    response = _post(url, payload)
+    result = _parse_json(response)
 
-    if verbose:
-        print(f"Response status code: {response.status_code}")
-        print(f"Response content: {json.dumps(result, indent=2)}")
+    logger.debug("Response status code: %s", response.status_code)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Response content: %s", _format_json(result))
 
     return result
 
-def get_existing_record(domain, record_type, name, content=None, prio=None, verbose=False):
+def record_key(record_type, name, content, prio=None):
     """
-    Retrieve an existing DNS record for a given domain, type, and name using the Porkbun API.
+    Build the lookup key identifying a DNS record.
 
     Args:
-        domain (str): The domain to search for the record.
-        record_type (str): The type of DNS record (e.g., 'A', 'MX', 'CNAME').
-        name (str): The name of the record.
-        content (str, optional): The content of the record to match.
-        prio (str, optional): The priority of the record to match (for MX, SRV, NAPTR records).
-        verbose (bool): If True, print detailed information about the API request and response.
+        record_type (str): The type of DNS record.
+        name (str): The fully qualified name of the record, with or without a trailing dot.
+        content (str): The content of the record.
+        prio (str, optional): The priority of the record (only used for MX, SRV, NAPTR records).
 
     Returns:
-        dict: The matching DNS record if found, None otherwise.
-
-    Raises:
-        json.JSONDecodeError: If the API response cannot be decoded.
-        KeyError: If the expected keys are not found in the API response.
+        tuple: A (type, name, content, prio) tuple.
     """
-    # Extract the root domain
-    root_domain = '.'.join(domain.split('.')[-2:])
-
-    # Determine the subdomain
-    subdomain = name if name != '@' else ''
-
-    url = f"{BASE_URL}/dns/retrieveByNameType/{root_domain}/{record_type}/{subdomain}"
-    payload = {
-        "secretapikey": SECRET_KEY,
-        "apikey": API_KEY
-    }
+    if record_type not in ['MX', 'SRV', 'NAPTR'] or prio is None:
+        prio = ''
+    return (record_type, name.rstrip('.'), content, str(prio))
 
-    if verbose:
-        print(f"Sending request to: {url}")
-        obfuscated_payload = {
-            "secretapikey": SECRET_KEY[:10] + "...",
-            "apikey": API_KEY[:10] + "..."
-        }
-        print(f"Payload: {json.dumps(obfuscated_payload, indent=2)}")
-
-    response = requests.post(url, json=payload)
+def build_record_index(records):
+    """
+    Index existing DNS records so they can be looked up locally instead of through the API.
 
-    if verbose:
-        print(f"Response status code: {response.status_code}")
-        print(f"Response content: {json.dumps(response.json(), indent=2)}")
+    Args:
+        records (list): The DNS records as returned by get_existing_records, or None.
 
-    try:
-        result = response.json()
-        if result['status'] == 'SUCCESS' and result.get('records'):
-            for record in result['records']:
-                if content and record['content'] == content:
-                    if record_type in ['MX', 'SRV', 'NAPTR'] and prio:
-                        if str(record['prio']) == str(prio):
-                            return record
-                    else:
-                        return record
-            if verbose:
-                print("No matching record found.")
-        return None
-    except json.JSONDecodeError as e:
-        print(f"JSON Decode Error: {str(e)}")
-        if verbose:
-            print(f"Response content: {response.text}")
-        return None
-    except KeyError as e:
-        print(f"KeyError: {str(e)}")
-        if verbose:
-            print(f"Full Response: {response.text}")
-        return None
+    Returns:
+        dict: A mapping of record keys (see record_key) to the existing record.
+    """
+    index = {}
+    for record in records or []:
+        key = record_key(record['type'], record['name'], record['content'], record.get('prio'))
+        index.setdefault(key, record)
+    return index
 
-def process_record(domain, record_type, name, record, force, verbose=False):
+def process_record(domain, record_type, name, record, existing_index, force):
     """
     Process a single DNS record, either creating a new one or updating an existing one.
 
@@ -295,13 +354,17 @@ def process_record(domain, record_type, name, record, force, verbose=False):
         record_type (str): The type of DNS record.
         name (str): The name of the record.
         record (dict): The record data.
+        existing_index (dict): Index of the existing records of the domain, as built by build_record_index.
         force (bool): If True, force update existing records.
-        verbose (bool): If True, print detailed information about the process.
+
+    Returns:
+        list: Messages describing the outcome, to be printed by the caller.
 
     Raises:
         KeyError: If required keys are missing in the record data.
         Exception: For any unexpected errors during processing.
     """
+    messages = []
     try:
         content = record['content']
         ttl = record['ttl']
@@ -309,10 +372,10 @@ def process_record(domain, record_type, name, record, force, verbose=False):
 
         if record_type in ['MX', 'SRV', 'NAPTR']:
             if prio is None:
-                print(f"Warning: 'prio' is missing for {record_type} record: {name}")
-                return
+                messages.append(f"Warning: 'prio' is missing for {record_type} record: {name}")
+                return messages
 
-        existing_record = get_existing_record(domain, record_type, name, content, prio, verbose)
+        existing_record = existing_index.get(record_key(record_type, name, content, prio))
 
         record_data = {
             'name': name,
@@ -325,75 +388,109 @@ def process_record(domain, record_type, name, record, force, verbose=False):
 
         if existing_record:
             if force:
-                result = update_record(domain, existing_record['id'], record_data, verbose)
-                print(f"Updated record: {name} ({record_type}) - {result['status']}")
+                result = update_record(domain, existing_record['id'], record_data)
+                messages.append(f"Updated record: {name} ({record_type}) - {result['status']}")
                 if result['status'] == 'ERROR':
-                    print(f"Error details: {result.get('message', 'No detailed message provided')}")
-                    if verbose:
-                        print(f"Full error response: {json.dumps(result, indent=2)}")
+                    messages.append(f"Error details: {result.get('message', 'No detailed message provided')}")
+                    if logger.isEnabledFor(logging.DEBUG):
+                        logger.debug("Full error response: %s", _format_json(result))
             else:
-                print(f"Skipping existing record: {name} ({record_type}). Use --force to update.")
+                messages.append(f"Skipping existing record: {name} ({record_type}). Use --force to update.")
         else:
-            result = create_record(domain, record_data, verbose)
-            print(f"Created record: {name} ({record_type}) - {result['status']}")
+            result = create_record(domain, record_data)
+            messages.append(f"Created record: {name} ({record_type}) - {result['status']}")
             if result['status'] == 'ERROR':
-                print(f"Error details: {result.get('message', 'No detailed message provided')}")
-                if verbose:
-                    print(f"Full error response: {json.dumps(result, indent=2)}")
+                messages.append(f"Error details: {result.get('message', 'No detailed message provided')}")
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Full error response: %s", _format_json(result))
     except KeyError as e:
-        print(f"KeyError in process_record: Missing key {e} for record {name} ({record_type})")
-        if verbose:
-            print(f"Record data: {json.dumps(record, indent=2)}")
+        messages.append(f"KeyError in process_record: Missing key {e} for record {name} ({record_type})")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Record data: %s", _format_json(record))
     except Exception as e:
-        print(f"Unexpected error in process_record for {name} ({record_type}): {str(e)}")
-        if verbose:
-            print(f"Record data: {json.dumps(record, indent=2)}")
-            traceback.print_exc()
+        messages.append(f"Unexpected error in process_record for {name} ({record_type}): {str(e)}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Record data: %s", _format_json(record), exc_info=True)
 
-def import_dns_records(new_records, force=False, verbose=False):
+    return messages
+
+def import_dns_records(new_records, force=False):
     """
     Import DNS records for one or more domains.
 
     Args:
         new_records (list): A list of dictionaries containing DNS records to import.
         force (bool): If True, force update existing records.
-        verbose (bool): If True, print detailed information about the import process.
     """
-    for domain_data in new_records:
-        for domain, records in domain_data.items():
-            print(f"\nProcessing domain: {domain}")
-            for record_type, record_list in records.items():
-                for record in record_list:
-                    name = record.get('name', domain)
-
-                    # Ensure name ends with a dot
-                    if not name.endswith('.'):
-                        name += '.'
-
-                    if verbose:
-                        print(f"Processing record: {name} ({record_type}) - {record['content']}")
-                    process_record(domain, record_type, name, record, force, verbose)
-
-def export_dns_records_json(domain, verbose=False):
+    # Existing records are retrieved once per root domain and shared by all of its subdomains
+    existing_indexes = {}
+
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        for domain_data in new_records:
+            for domain, records in domain_data.items():
+                print(f"\nProcessing domain: {domain}")
+
+                root_domain = _root_domain(domain)
+                if root_domain not in existing_indexes:
+                    existing_records = get_existing_records(domain)
+                    # None means the lookup failed, as opposed to an empty zone; without the
+                    # existing records every record would be created again as a duplicate
+                    existing_indexes[root_domain] = (
+                        None if existing_records is None else build_record_index(existing_records)
+                    )
+                existing_index = existing_indexes[root_domain]
+                if existing_index is None:
+                    print(f"Error: Could not retrieve existing records for {root_domain}, skipping {domain}")
+                    continue
+
+                tasks = []
+                seen = set()
+                for record_type, record_list in records.items():
+                    for record in record_list:
+                        name = record.get('name', domain)
+
+                        # Ensure name ends with a dot
+                        if not name.endswith('.'):
+                            name += '.'
+
+                        # Skip records that appear more than once in the input
+                        key = record_key(record_type, name, record['content'], record.get('prio'))
+                        if key in seen:
+                            logger.debug("Skipping duplicate record: %s (%s) - %s", name, record_type, record['content'])
+                            continue
+                        seen.add(key)
+
+                        logger.debug("Processing record: %s (%s) - %s", name, record_type, record['content'])
+                        tasks.append((domain, record_type, name, record, existing_index))
+
+                # Wait for all records of this domain before moving on to the next one; messages
+                # are printed here, in input order, so lines from different workers never mix
+                for messages in executor.map(lambda task: process_record(*task, force), tasks):
+                    for message in messages:
+                        print(message)
+
+def export_dns_records_json(domain):
     """
     Export DNS records for a given domain in JSON format.
 
+    Records are grouped by type and name; each name maps to a list of its records.
+
     Args:
         domain (str): The domain to export records for.
-        verbose (bool): If True, print detailed information about the export process.
 
     Returns:
         list: A list containing a dictionary of DNS records for the domain, or None if an error occurs.
     """
-    records = get_existing_records(domain, verbose)
+    records = get_existing_records(domain)
     if records:
+        root_domain = _root_domain(domain)
         export_data = {}
         for record in records:
             record_type = record['type']
             if record_type not in export_data:
                 export_data[record_type] = {}
 
-            name = record['name'] if record['name'] != domain else '@'
+            name = record['name'] if record['name'] != root_domain else '@'
 
             content = record['content']
             ttl = record['ttl']
@@ -404,14 +501,8 @@ def export_dns_records_json(domain, verbose=False):
             # Create a dictionary with 'content' and 'ttl', excluding null values
             record_data = {k: v for k, v in {'content': content, 'ttl': ttl}.items() if v is not None}
 
-            # Handle multiple records for the same name and type
-            if name in export_data[record_type]:
-                if isinstance(export_data[record_type][name], list):
-                    export_data[record_type][name].append(record_data)
-                else:
-                    export_data[record_type][name] = [export_data[record_type][name], record_data]
-            else:
-                export_data[record_type][name] = record_data
+            # Every name maps to a list, which also holds multiple records for the same name and type
+            export_data[record_type].setdefault(name, []).append(record_data)
 
         # Wrap the export_data in the new structure
         new_structure = [{domain: export_data}]
@@ -490,11 +581,15 @@ if __name__ == "__main__":
         print_usage()
         sys.exit(0)
 
+    # Verbose output goes to stdout, interleaved with the regular progress messages
+    logging.basicConfig(stream=sys.stdout, format="%(message)s")
+    logger.setLevel(logging.DEBUG if args.verbose else logging.WARNING)
+
     if args.file or not sys.stdin.isatty():
         # Import DNS records
         try:
             new_records = read_input(args.file)
-            import_dns_records(new_records, args.force, args.verbose)
+            import_dns_records(new_records, args.force)
         except json.JSONDecodeError as e:
             print(f"Error: Invalid JSON input - {str(e)}")
             sys.exit(1)